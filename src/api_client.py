@@ -10,14 +10,29 @@ Features:
 - Provides convenient methods: .get(), .post(), .put(), .delete()
 - Automatically adds headers like Accept, User-Agent
 - Supports environment-based switching (dev/qa/prod) via settings
+- Tunable keep-alive connection pool (pool sizes, blocking, DNS caching)
+- warm_up() pre-opens connections so the first test doesn't pay TCP+TLS setup
+- pool_stats() exposes reuse ratio, new connections, pool waits and discarded overflow connections
+- Reports transport and retry-wait time to the profiler when --layer-profile is on
 
 This client is used in all test files via the `client` fixture.
 """
 
 import os
+import socket
+import threading
+import time
 import yaml
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.exceptions import HTTPError as URLLib3HTTPError
+from urllib3.util.connection import allowed_gai_family
 from tenacity import retry, stop_after_attempt, wait_exponential_jitter
+from src.utils.profiler import PROFILER
 
 # Load configuration from YAML file
 def _load_settings():
@@ -36,10 +51,241 @@ def _load_settings():
     retries = cfg["default"].get("retries", 2)
     backoff = cfg["default"].get("retry_backoff", 0.2)
 
-    return base_url.rstrip("/"), timeout, retries, backoff
+    # Connection pool tuning (missing keys fall back to requests' defaults)
+    pool = {
+        "connections": 10,
+        "maxsize": 10,
+        "block": False,
+        "dns_cache_ttl": 0,
+        "warmup": 0,
+    }
+    pool.update(cfg["default"].get("pool") or {})
+
+    return base_url.rstrip("/"), timeout, retries, backoff, pool
 
 # Load settings once at module level
-BASE_URL, TIMEOUT, RETRIES, BACKOFF = _load_settings()
+BASE_URL, TIMEOUT, RETRIES, BACKOFF, POOL = _load_settings()
+
+
+def _retry_sleep(seconds: float):
+    """
+    Sleep used by tenacity between attempts, timed as the profiler's retry_wait layer.
+    """
+    with PROFILER.layer("retry_wait"):
+        time.sleep(seconds)
+
+
+class PoolStats:
+    """
+    Thread-safe counters describing how the connection pool is being used.
+
+    Every time a request checks a connection out of the pool it is either
+    "reused" (socket already open, no TCP/TLS handshake) or "new" (socket
+    has to be opened). A "wait" is a checkout that found the pool exhausted
+    while running in blocking mode. In non-blocking mode an exhausted pool
+    opens overflow connections instead, which are "discarded" (closed) when
+    returned to the already-full pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, prewarmed: int = 0):
+        """
+        Clears all counters (e.g. after warm-up, so warm-up isn't counted as traffic).
+        """
+        with self._lock:
+            self.checkouts = 0
+            self.reused = 0
+            self.waits = 0
+            self.wait_seconds = 0.0
+            self.discarded = 0
+            self.prewarmed = prewarmed
+
+    def record_checkout(self, reused: bool, waited: float = None):
+        with self._lock:
+            self.checkouts += 1
+            if reused:
+                self.reused += 1
+            if waited is not None:
+                self.waits += 1
+                self.wait_seconds += waited
+
+    def record_discard(self):
+        with self._lock:
+            self.discarded += 1
+
+    def snapshot(self) -> dict:
+        """
+        Returns the current counters as a plain dictionary.
+        """
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "reused": self.reused,
+                "new_connections": self.checkouts - self.reused,
+                "reuse_ratio": round(self.reused / self.checkouts, 3) if self.checkouts else 0.0,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 4),
+                "discarded": self.discarded,
+                "prewarmed": self.prewarmed,
+            }
+
+
+# Resolved addresses shared by all clients: {(host, port): ([addresses], expires_at)}
+_DNS_CACHE = {}
+
+
+def _resolve_host(host: str, port: int, ttl: float) -> list:
+    """
+    Resolves host to all of its addresses (in getaddrinfo order, honouring urllib3's
+    allowed_gai_family()), reusing a cached answer for `ttl` seconds.
+    Returns [] on lookup failure so urllib3 resolves the name itself and raises its usual error.
+    """
+    now = time.monotonic()
+    cached = _DNS_CACHE.get((host, port))
+    if cached and cached[1] > now:
+        return cached[0]
+
+    try:
+        infos = socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        return []
+
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    _DNS_CACHE[(host, port)] = (addresses, now + ttl)
+    return addresses
+
+
+class _CachedDNSConnectionMixin:
+    """
+    Resolves through _DNS_CACHE each time the socket is (re)opened and tries every cached
+    address in order, like urllib3's own create_connection() does for a fresh lookup.
+    `dns_cache_ttl` is set by the pool when it creates the connection (0 = plain urllib3).
+    """
+
+    dns_cache_ttl = 0
+
+    def _new_conn(self):
+        host = self._dns_host
+        addresses = _resolve_host(host, self.port, self.dns_cache_ttl) if self.dns_cache_ttl else []
+        if not addresses:
+            return super()._new_conn()
+
+        error = None
+        try:
+            for address in addresses:
+                # Only the socket target changes; Host header, SNI and cert checks still use self.host
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+        finally:
+            self._dns_host = host
+
+        # Every cached address failed: forget them so the next attempt resolves again
+        _DNS_CACHE.pop((host, self.port), None)
+        raise error
+
+
+class _CachedDNSHTTPConnection(_CachedDNSConnectionMixin, HTTPConnection):
+    pass
+
+
+class _CachedDNSHTTPSConnection(_CachedDNSConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TrackedPoolMixin:
+    """
+    Adds usage tracking and DNS caching to urllib3 connection pools.
+    `stats` and `dns_cache_ttl` are set by _TrackedPoolManager right after the pool is built.
+    """
+
+    stats = None
+    dns_cache_ttl = 0
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.dns_cache_ttl = self.dns_cache_ttl
+        return conn
+
+    def _get_conn(self, timeout=None):
+        exhausted = self.block and self.pool is not None and self.pool.empty()
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout=timeout)
+
+        if self.stats is not None:
+            waited = time.perf_counter() - start if exhausted else None
+            self.stats.record_checkout(reused=getattr(conn, "sock", None) is not None, waited=waited)
+        return conn
+
+    def _put_conn(self, conn):
+        # A full queue means urllib3 closes this connection ("Connection pool is full, discarding")
+        if self.stats is not None and conn is not None and self.pool is not None and self.pool.full():
+            self.stats.record_discard()
+        super()._put_conn(conn)
+
+
+class _TrackedHTTPConnectionPool(_TrackedPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+
+class _TrackedHTTPSConnectionPool(_TrackedPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+
+class _TrackedPoolManager(PoolManager):
+    """
+    PoolManager that builds tracked pools and hands them the shared stats object.
+    """
+
+    def __init__(self, *args, stats=None, dns_cache_ttl=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+        self.dns_cache_ttl = dns_cache_ttl
+        self.pool_classes_by_scheme = {
+            "http": _TrackedHTTPConnectionPool,
+            "https": _TrackedHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        pool.stats = self.stats
+        pool.dns_cache_ttl = self.dns_cache_ttl
+        return pool
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    requests adapter with a tunable, instrumented keep-alive connection pool.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False, dns_cache_ttl: float = 0):
+        # Must exist before HTTPAdapter.__init__ calls init_poolmanager()
+        self.stats = PoolStats()
+        self.dns_cache_ttl = dns_cache_ttl
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _TrackedPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            stats=self.stats,
+            dns_cache_ttl=self.dns_cache_ttl,
+            **pool_kwargs,
+        )
 
 class APIClient:
     """
@@ -47,11 +293,29 @@ class APIClient:
     Adds retry, timeout, and default headers.
     """
 
-    def __init__(self, base_url: str = BASE_URL, timeout: int = TIMEOUT):
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        timeout: int = TIMEOUT,
+        pool_connections: int = POOL["connections"],
+        pool_maxsize: int = POOL["maxsize"],
+        pool_block: bool = POOL["block"],
+        dns_cache_ttl: float = POOL["dns_cache_ttl"],
+    ):
         self.base_url = base_url
         self.timeout = timeout
         self.session = requests.Session()  # Creates a reusable session (efficient for multiple requests)
 
+        # Replace the default adapters with a tuned, instrumented keep-alive pool
+        self.adapter = PooledAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            dns_cache_ttl=dns_cache_ttl,
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
         # Add default headers for all requests
         self.session.headers.update({
             "Accept": "application/json, */*;q=0.5",
@@ -64,20 +328,62 @@ class APIClient:
         """
         return f"{self.base_url}/{path.lstrip('/')}"
 
+    def warm_up(self, connections: int = POOL["warmup"]) -> int:
+        """
+        Pre-opens up to `connections` keep-alive connections to base_url (DNS + TCP + TLS)
+        so the first real request reuses a hot socket. Failures are ignored, the
+        request itself will surface them. Returns the number of connections opened.
+        """
+        prepared = self.session.prepare_request(requests.Request("GET", self._url("")))
+        # Same env-merged settings as Session.request(), otherwise we'd warm a different pool
+        settings = self.session.merge_environment_settings(prepared.url, {}, None, None, None)
+        pool = self.adapter.get_connection_with_tls_context(
+            prepared, verify=settings["verify"], proxies=settings["proxies"], cert=settings["cert"]
+        )
+
+        checked_out = []
+        opened = 0
+        for _ in range(min(connections, self.adapter._pool_maxsize)):
+            conn = pool._get_conn()
+            checked_out.append(conn)
+            try:
+                conn.timeout = self.timeout
+                conn.connect()
+                opened += 1
+            except (OSError, URLLib3HTTPError):
+                conn.close()
+                break
+
+        # Return every connection to the pool so requests can pick them up
+        for conn in checked_out:
+            pool._put_conn(conn)
+
+        self.adapter.stats.reset(prewarmed=opened)
+        return opened
+
+    def pool_stats(self) -> dict:
+        """
+        Returns connection pool usage: checkouts, reused, new_connections,
+        reuse_ratio, waits, wait_seconds, discarded and prewarmed.
+        """
+        return self.adapter.stats.snapshot()
+
     @retry(
         stop=stop_after_attempt(RETRIES),
-        wait=wait_exponential_jitter(initial=BACKOFF, max=2)
+        wait=wait_exponential_jitter(initial=BACKOFF, max=2),
+        sleep=_retry_sleep
     )
     def request(self, method: str, path: str, **kwargs) -> requests.Response:
         """
         Core request method (with retry). Can be used directly or via .get/.post wrappers.
         """
-        return self.session.request(
-            method=method.upper(),
-            url=self._url(path),
-            timeout=self.timeout,
-            **kwargs  # This can include json=, data=, headers=, etc.
-        )
+        with PROFILER.layer("transport"):
+            return self.session.request(
+                method=method.upper(),
+                url=self._url(path),
+                timeout=self.timeout,
+                **kwargs  # This can include json=, data=, headers=, etc.
+            )
 
     # Shortcut methods for GET, POST, PUT, DELETE
     def get(self, path, **kw): return self.request("GET", path, **kw)
@@ -9,12 +9,15 @@ Features:
 - assert_json(): Parse response as JSON, fail with body preview
 - assert_schema(): Validate JSON response using a schema
 - assert_in_body(): Check if plain/text HTML body contains expected text
+- All helpers are timed as the profiler's "assertions" layer (schema validation as "schema")
 """
 
 import allure
 from jsonschema import validate
+from src.utils.profiler import PROFILER, profiled
 
 
+@profiled("assertions")
 def assert_status(response, expected=200):
     with allure.step(f"Assert status code == {expected}"):
         actual = response.status_code
@@ -32,6 +35,7 @@ def assert_status(response, expected=200):
         assert actual == expected, f"❌ Expected status {expected}, but got {actual}. Body: {response.text[:300]}"
 
 
+@profiled("assertions")
 def assert_header(response, header_name, expected_contains=None):
     """
     Asserts that a specific header exists in the response and optionally contains an expected value.
@@ -57,6 +61,7 @@ def assert_header(response, header_name, expected_contains=None):
             assert expected_contains in value, f"❌ Header {header_name} does not contain expected value: '{expected_contains}'"
 
 
+@profiled("assertions")
 def assert_json(response):
     with allure.step("Assert response is valid JSON"):
         allure.attach(
@@ -74,11 +79,13 @@ def assert_json(response):
         return parsed
 
 
+@profiled("assertions")
 def assert_schema(instance: dict, schema: dict):
-    with allure.step("Validate JSON schema"):
+    with allure.step("Validate JSON schema"), PROFILER.layer("schema"):
         validate(instance=instance, schema=schema)
 
 
+@profiled("assertions")
 def assert_in_body(response, expected: str):
     with allure.step(f"Assert body contains: '{expected}'"):
         allure.attach(
@@ -0,0 +1,288 @@
+"""
+fanout.py
+----------
+This file defines EnvFanOut, which runs the same API calls against several environments at once.
+
+Features:
+- Holds one APIClient per environment (dev/qa/prod from `config/settings.yaml`)
+- The first environment to issue a request sends it to ALL environments concurrently
+- The other environments' tests pick up the already-finished response instead of calling again
+- Calls are matched by (test, call index within the test), so dynamic payloads still line up
+- File/iterator bodies are read once and every environment gets its own copy
+- Records status, latency and body per environment for every call
+- Builds a side-by-side Markdown report with status/latency differences per endpoint
+  and payload diffs between environments
+
+Used by the `client` fixture when pytest runs with --envs (see tests/conftest.py).
+"""
+
+import copy
+import difflib
+import json
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.utils import guess_filename
+
+from src.utils.files import write_text_file
+from src.utils.profiler import PROFILER
+
+# Max lines of unified diff shown per endpoint/environment pair in the report
+DIFF_PREVIEW_LINES = 40
+
+
+def _normalize_body(text: str) -> str:
+    """
+    Returns a stable, line-based version of a body for diffing (pretty JSON when possible).
+    """
+    try:
+        return json.dumps(json.loads(text), indent=2, sort_keys=True)
+    except ValueError:
+        return text
+
+
+def _read_body(value):
+    """
+    Reads a file-like object or iterator body into bytes; other values are returned as-is.
+    """
+    if hasattr(value, "read"):
+        content = value.read()
+        return content.encode("utf-8") if isinstance(content, str) else content
+    if hasattr(value, "__next__"):
+        return b"".join(c.encode("utf-8") if isinstance(c, str) else c for c in value)
+    return value
+
+
+def _freeze_kwargs(kwargs: dict) -> dict:
+    """
+    Makes request arguments safe to send more than once: `data` and `files` streams are read
+    into bytes (keeping upload file names) so every environment sends the same body.
+    """
+    frozen = dict(kwargs)
+    if "data" in frozen:
+        frozen["data"] = _read_body(frozen["data"])
+
+    files = frozen.get("files")
+    if files:
+        items = files.items() if isinstance(files, dict) else files
+        frozen_files = []
+        for field, value in items:
+            if isinstance(value, (tuple, list)):
+                value = (value[0], _read_body(value[1]), *value[2:])
+            elif hasattr(value, "read"):
+                value = (guess_filename(value) or field, _read_body(value))
+            frozen_files.append((field, value))
+        frozen["files"] = dict(frozen_files) if isinstance(files, dict) else frozen_files
+    return frozen
+
+
+class EnvClient:
+    """
+    APIClient-compatible view of EnvFanOut bound to one environment.
+    Tests use it exactly like APIClient: client.get(...), client.post(...).
+    """
+
+    def __init__(self, fanout, env: str):
+        self.fanout = fanout
+        self.env = env
+        self.base_url = fanout.clients[env].base_url
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        # The HTTP call runs on a worker thread, so the wait for it is the test's transport time
+        with PROFILER.layer("transport"):
+            return self.fanout.dispatch(self.env, method, path, **kwargs)
+
+    # Shortcut methods for GET, POST, PUT, DELETE
+    def get(self, path, **kw): return self.request("GET", path, **kw)
+    def post(self, path, **kw): return self.request("POST", path, **kw)
+    def put(self, path, **kw): return self.request("PUT", path, **kw)
+    def delete(self, path, **kw): return self.request("DELETE", path, **kw)
+
+
+class EnvFanOut:
+    """
+    Sends each request to every environment concurrently and keeps the results for comparison.
+
+    Calls are matched across environments by (test, call index within that test): the n-th
+    call made by test_x[dev] lines up with the n-th call made by test_x[qa], whatever its payload.
+    The first environment to reach a call sends it to every environment; a call that can't be
+    matched (no test announced, different method/path, or a re-run) is sent to its own
+    environment only, so nothing is ever duplicated against another environment.
+    """
+
+    def __init__(self, clients: dict, max_workers: int = None):
+        self.clients = clients
+        self.envs = list(clients)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(clients) * 4,
+            thread_name_prefix="env-fanout",
+        )
+        self._lock = threading.Lock()
+        self._current = {}  # env -> [test key, next call index]
+        self._pending = {}  # (test key, call index) -> slot waiting for other envs
+        self._done = set()  # (test key, call index) already collected by every env
+        self._calls = []  # [(endpoint, {env: Future})] in dispatch order
+
+    def view(self, env: str) -> EnvClient:
+        """
+        Returns a client bound to one environment.
+        """
+        return EnvClient(self, env)
+
+    def begin_test(self, env: str, test_key):
+        """
+        Announces the test env's client is about to run. test_key must be the same for every
+        environment's copy of the test (e.g. nodeid without the env parameter).
+        """
+        with self._lock:
+            self._current[env] = [test_key, 0]
+
+    def _send(self, env: str, method: str, path: str, kwargs: dict) -> requests.Response:
+        return self.clients[env].request(method, path, **kwargs)
+
+    def dispatch(self, env: str, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Returns env's response for this call, fanning it out to all environments on first use.
+        Exceptions raised for env (e.g. connection errors) are re-raised here.
+        """
+        endpoint = f"{method.upper()} /{path.lstrip('/')}"
+
+        with self._lock:
+            current = self._current.get(env)
+            match = None
+            if current is not None:
+                match = (current[0], current[1])
+                current[1] += 1
+
+            slot = self._pending.get(match)
+            if match is None or match in self._done or (slot and (
+                    slot["endpoint"] != endpoint or env not in slot["waiting"])):
+                slot = None  # unmatched: this environment only
+            elif slot is None:
+                frozen = _freeze_kwargs(kwargs)
+                futures = {
+                    e: self._executor.submit(self._send, e, method, path, copy.deepcopy(frozen))
+                    for e in self.envs
+                }
+                slot = {"endpoint": endpoint, "futures": futures, "waiting": set(self.envs)}
+                self._pending[match] = slot
+                self._calls.append((endpoint, futures))
+
+            if slot is not None:
+                # Forget the slot once every environment has collected its response
+                slot["waiting"].discard(env)
+                if not slot["waiting"]:
+                    del self._pending[match]
+                    self._done.add(match)
+
+        if slot is None:
+            return self._send(env, method, path, kwargs)
+        return slot["futures"][env].result()
+
+    def _collect(self):
+        """
+        Waits for all calls and returns [(endpoint, {env: result dict})].
+        """
+        collected = []
+        for endpoint, futures in self._calls:
+            results = {}
+            for env, future in futures.items():
+                try:
+                    resp = future.result()
+                    results[env] = {
+                        "status": resp.status_code,
+                        "elapsed": resp.elapsed.total_seconds(),
+                        "body": _normalize_body(resp.text),
+                    }
+                except Exception as e:
+                    results[env] = {"status": type(e).__name__, "elapsed": None, "body": None}
+            collected.append((endpoint, results))
+        return collected
+
+    def report(self) -> str:
+        """
+        Builds the Markdown comparison report (status, latency and payload diffs per endpoint).
+        """
+        collected = self._collect()
+        baseline = self.envs[0]
+
+        # endpoint -> env -> list of statuses / latencies
+        statuses = defaultdict(lambda: defaultdict(list))
+        latencies = defaultdict(lambda: defaultdict(list))
+        for endpoint, results in collected:
+            for env, result in results.items():
+                statuses[endpoint][env].append(result["status"])
+                if result["elapsed"] is not None:
+                    latencies[endpoint][env].append(result["elapsed"])
+
+        lines = [
+            f"# Environment comparison: {' vs '.join(self.envs)}",
+            "",
+            "## Status and latency per endpoint",
+            "",
+            "| Endpoint | Calls | " + " | ".join(self.envs) + " | Status differs | Slowest (vs fastest) |",
+            "|---|---|" + "---|" * len(self.envs) + "---|---|",
+        ]
+        for endpoint in statuses:
+            cells = []
+            means = {}
+            for env in self.envs:
+                codes = "/".join(sorted(set(map(str, statuses[endpoint][env]))))
+                times = latencies[endpoint][env]
+                if times:
+                    means[env] = sum(times) / len(times)
+                    cells.append(f"{codes} · {means[env]:.3f}s")
+                else:
+                    cells.append(codes)
+
+            differs = len({tuple(statuses[endpoint][env]) for env in self.envs}) > 1
+            slowest = "-"
+            fastest = min(means.values(), default=0)
+            if len(means) > 1 and fastest > 0:
+                slow_env = max(means, key=means.get)
+                slowest = f"{slow_env} ({means[slow_env] / fastest:.1f}x)"
+
+            lines.append(
+                f"| {endpoint} | {len(statuses[endpoint][baseline])} | " + " | ".join(cells)
+                + f" | {'⚠️ yes' if differs else 'no'} | {slowest} |"
+            )
+
+        lines += ["", f"## Payload differences (vs {baseline})", ""]
+        seen_diffs = set()
+        for endpoint, results in collected:
+            base_body = results[baseline]["body"]
+            for env in self.envs[1:]:
+                body = results[env]["body"]
+                if base_body is None or body is None or body == base_body:
+                    continue
+
+                diff = list(difflib.unified_diff(
+                    base_body.splitlines(), body.splitlines(),
+                    fromfile=baseline, tofile=env, lineterm="", n=1,
+                ))
+                signature = (endpoint, env, "\n".join(diff))
+                if signature in seen_diffs:
+                    continue
+                seen_diffs.add(signature)
+
+                if len(diff) > DIFF_PREVIEW_LINES:
+                    diff = diff[:DIFF_PREVIEW_LINES] + [f"... ({len(diff) - DIFF_PREVIEW_LINES} more lines)"]
+                lines += [f"### {endpoint}: {baseline} → {env}", "", "```diff", *diff, "```", ""]
+
+        if not seen_diffs:
+            lines.append("No payload differences found.")
+
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: str) -> str:
+        """
+        Writes report() to `path` (creating the folder if missing) and returns the path.
+        """
+        return write_text_file(path, self.report())
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for client in self.clients.values():
+            client.session.close()
@@ -3,12 +3,15 @@ attachments.py
 ---------------
 This utility provides reusable functions to attach API request/response details
 to Allure reports in a structured and consistent way.
+Calls are timed as the profiler's "attachments" layer.
 """
 
 import allure
 import json
+from src.utils.profiler import profiled
 
 
+@profiled("attachments")
 def attach_response(response, name: str = "response"):
     """
     Attaches the request and response info to the Allure report.
@@ -0,0 +1,26 @@
+"""
+files.py
+---------
+Small helpers for writing run artifacts (reports, profiles) to disk.
+"""
+
+import os
+
+
+def write_text_file(path: str, text: str) -> str:
+    """
+    Writes text to `path`, creating the parent folder if missing.
+
+    Args:
+        path (str): Destination file path
+        text (str): Content to write (UTF-8)
+
+    Returns:
+        str: The path that was written
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
@@ -0,0 +1,240 @@
+"""
+profiler.py
+------------
+This file defines a lightweight, opt-in profiler that attributes client-side time per test
+and per framework layer.
+
+Features:
+- Layers: transport, retry_wait, decode, assertions, schema, attachments, allure_io, logging
+  (time not covered by any layer is reported as "test")
+- "attachments" is our own formatting (e.g. attach_response pretty-printing);
+  "allure_io" is allure writing the attachment files, nested under it when called from there
+- Traces layer boundaries with time.perf_counter() instead of sampling every frame,
+  so the overhead is a few microseconds per request/assertion (safe for nightly runs)
+- Nested layers are tracked as stacks, e.g. attachments;decode
+- Per-test breakdown (seconds and share per layer) for the Allure report
+- Folded-stack output (`test;layer;sublayer microseconds`) for flamegraph.pl / speedscope
+- Does nothing unless enabled (pytest --layer-profile, see tests/conftest.py)
+"""
+
+import functools
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+import allure_commons
+import requests
+
+from src.utils.files import write_text_file
+
+# Layer name used for time spent in the test body itself (outside any layer)
+TEST_LAYER = "test"
+
+_NO_LAYER = nullcontext()
+
+
+class _LayerScope:
+    """
+    Context manager that times one layer and records its self-time (children excluded).
+    """
+
+    __slots__ = ("profiler", "name", "pushed")
+
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.pushed = False
+
+    def __enter__(self):
+        stack = self.profiler._stack
+        # Re-entering the same layer (e.g. an assertion helper calling another one) is merged
+        if stack[-1][0] != self.name:
+            stack.append([self.name, time.perf_counter(), 0.0])
+            self.pushed = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.pushed:
+            return False
+
+        stack = self.profiler._stack
+        name, start, children = stack.pop()
+        elapsed = time.perf_counter() - start
+        path = tuple(frame[0] for frame in stack[1:]) + (name,)
+        self.profiler._self_times[path] += elapsed - children
+        stack[-1][2] += elapsed
+        return False
+
+
+class _AllureAttachTimer:
+    """
+    allure plugin timing attach_data/attach_file (allure.attach and allure.attach.file)
+    as the "allure_io" layer, separate from our own "attachments" formatting.
+    Registered on allure's own plugin manager, so allure.attach itself is left untouched.
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    @allure_commons.hookimpl(hookwrapper=True)
+    def attach_data(self, body, name, attachment_type, extension):
+        with self.profiler.layer("allure_io"):
+            yield
+
+    @allure_commons.hookimpl(hookwrapper=True)
+    def attach_file(self, source, name, attachment_type, extension):
+        with self.profiler.layer("allure_io"):
+            yield
+
+
+class LayerProfiler:
+    """
+    Collects per-test, per-layer timings. Only the thread that started the current test is
+    traced, so background threads (e.g. --envs fan-out workers) never corrupt the stack.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._test_id = None
+        self._thread = None
+        self._stack = []
+        self._self_times = defaultdict(float)
+        self._folded = defaultdict(int)  # "test;layer;..." -> microseconds
+        self._patched = []
+        self._attach_timer = None
+
+    def enable(self, logger=None):
+        """
+        Turns profiling on and instruments code we don't own:
+        requests.Response.json (decode), allure attachment writes (allure_io, via an allure plugin)
+        and the logger (logging).
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+
+        self._patch(requests.Response, "json", "decode")
+        self._attach_timer = _AllureAttachTimer(self)
+        allure_commons.plugin_manager.register(self._attach_timer)
+        if logger is not None:
+            # callHandlers covers the logger's own handlers and propagation to root handlers
+            self._patch(logger, "callHandlers", "logging")
+
+    def disable(self):
+        """
+        Turns profiling off and restores everything patched by enable().
+        """
+        for owner, attr, original, had_own in reversed(self._patched):
+            if had_own:
+                setattr(owner, attr, original)
+            else:
+                delattr(owner, attr)
+        self._patched = []
+
+        if self._attach_timer is not None:
+            allure_commons.plugin_manager.unregister(self._attach_timer)
+            self._attach_timer = None
+        self.enabled = False
+
+    def _patch(self, owner, attr: str, layer_name: str):
+        had_own = attr in vars(owner)
+        original = getattr(owner, attr)
+        self._patched.append((owner, attr, vars(owner).get(attr), had_own))
+        setattr(owner, attr, self.wrap(layer_name, original))
+
+    def wrap(self, layer_name: str, func):
+        """
+        Returns func wrapped so every call is timed under layer_name.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.layer(layer_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def layer(self, name: str):
+        """
+        Context manager timing a block under `name`. A no-op when no test is being profiled.
+        """
+        if self._test_id is None or threading.get_ident() != self._thread:
+            return _NO_LAYER
+        return _LayerScope(self, name)
+
+    def start_test(self, test_id: str):
+        """
+        Starts profiling one test (usually the pytest nodeid).
+        """
+        if not self.enabled:
+            return
+        self._test_id = test_id.replace(";", ",")
+        self._thread = threading.get_ident()
+        self._self_times = defaultdict(float)
+        self._stack = [[TEST_LAYER, time.perf_counter(), 0.0]]
+
+    def stop_test(self) -> dict:
+        """
+        Stops profiling the current test and returns its breakdown:
+        {"test": id, "total": seconds, "layers": {layer: seconds}}.
+        """
+        if self._test_id is None:
+            return {}
+
+        # Close any layer left open by an exception, then the test root itself
+        now = time.perf_counter()
+        while self._stack:
+            name, start, children = self._stack.pop()
+            elapsed = now - start
+            path = tuple(frame[0] for frame in self._stack[1:]) + ((name,) if self._stack else ())
+            self._self_times[path] += elapsed - children
+            if self._stack:
+                self._stack[-1][2] += elapsed
+        total = elapsed
+
+        layers = defaultdict(float)
+        for path, seconds in self._self_times.items():
+            layers[path[-1] if path else TEST_LAYER] += seconds
+            stack_name = ";".join((self._test_id,) + path)
+            self._folded[stack_name] += int(seconds * 1_000_000)
+
+        breakdown = {"test": self._test_id, "total": total, "layers": dict(layers)}
+        self._test_id = None
+        self._thread = None
+        return breakdown
+
+    def folded(self) -> str:
+        """
+        Returns all profiled tests as folded stacks, one "frame;frame;... microseconds" per line.
+        """
+        return "\n".join(f"{stack} {us}" for stack, us in self._folded.items() if us > 0) + "\n"
+
+    def write_folded(self, path: str) -> str:
+        """
+        Writes folded() to `path` (creating the folder if missing) and returns the path.
+        """
+        return write_text_file(path, self.folded())
+
+
+def format_breakdown(breakdown: dict) -> str:
+    """
+    Formats a stop_test() breakdown as a plain-text table, slowest layer first.
+    """
+    total = breakdown["total"] or 1e-9
+    lines = [f"{'Layer':<14}{'Seconds':>10}{'Share':>9}"]
+    for name, seconds in sorted(breakdown["layers"].items(), key=lambda item: -item[1]):
+        lines.append(f"{name:<14}{seconds:>10.4f}{seconds / total:>9.1%}")
+    lines.append(f"{'total':<14}{breakdown['total']:>10.4f}")
+    return "\n".join(lines)
+
+
+# Shared profiler used by APIClient, assertions, attachments and conftest
+PROFILER = LayerProfiler()
+
+
+def profiled(layer_name: str):
+    """
+    Decorator timing every call of the function under layer_name (when profiling is on).
+    """
+    def decorator(func):
+        return PROFILER.wrap(layer_name, func)
+    return decorator
@@ -5,10 +5,15 @@ Pytest configuration file that provides shared fixtures and command-line options
 
 Features:
 - Supports --env flag to switch between dev, qa, prod
+- Supports --envs flag to run the suite against several environments concurrently
+  and write a side-by-side comparison report (see src/fanout.py)
 - Loads environment config from settings.yaml
 - Injects logger and APIClient into every test
+- Warms up the client's connection pool before the first test and logs pool stats at the end
 - Automatically attaches request/response to Allure report
 - Tags each test in Allure with the active environment
+- Supports --layer-profile flag to break each test's time down by framework layer
+  (Allure attachment per test + folded stacks for flamegraphs, see src/utils/profiler.py)
 """
 
 import os
@@ -18,25 +23,153 @@ import pytest
 import yaml
 import allure
 from src.api_client import APIClient
+from src.fanout import EnvFanOut
 from src.utils.logger import get_logger
+from src.utils.profiler import PROFILER, format_breakdown
 
 def pytest_addoption(parser):
     """
-    Adds a custom command-line flag to pytest: --env
+    Adds custom command-line flags to pytest: --env, --envs, --envs-report, --layer-profile, --layer-profile-output
     """
     parser.addoption(
         "--env",
         action="store",
-        default="dev",
-        help="Target environment: dev | qa | prod"
+        default=None,
+        help="Target environment: dev | qa | prod (default = dev)"
+    )
+    parser.addoption(
+        "--envs",
+        action="store",
+        default=None,
+        help="Comma-separated environments to run concurrently, e.g. dev,qa,prod (or 'all'). Replaces --env"
+    )
+    parser.addoption(
+        "--envs-report",
+        action="store",
+        default="artifacts/env-comparison.md",
+        help="Where --envs writes the side-by-side environment comparison report"
+    )
+    parser.addoption(
+        "--layer-profile",
+        action="store_true",
+        default=False,
+        help="Profile client-side time per test and per layer (transport, decode, assertions, ...)"
+    )
+    parser.addoption(
+        "--layer-profile-output",
+        action="store",
+        default="artifacts/profile.folded",
+        help="Where --layer-profile writes folded stacks (input for flamegraph.pl / speedscope)"
+    )
+
+# settings.yaml and the validated --envs list, parsed once in pytest_configure
+SETTINGS_KEY = pytest.StashKey[dict]()
+ENVS_KEY = pytest.StashKey[list]()
+
+def _load_config():
+    with open("config/settings.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+def _parse_envs(value, cfg):
+    """
+    Returns the environments passed via --envs (all configured ones for 'all'), or [] if not set.
+    """
+    if not value:
+        return []
+
+    known = list(cfg.get("envs", {}).keys())
+    if value.strip().lower() == "all":
+        return known
+
+    # dict.fromkeys drops repeats (dev,dev) while keeping the given order
+    envs = list(dict.fromkeys(e.strip().lower() for e in value.split(",") if e.strip()))
+    invalid = [e for e in envs if e not in known]
+    if invalid:
+        raise pytest.UsageError(f"Invalid --envs {invalid}. Use any of: {known}")
+    return envs
+
+def _selected_envs(config):
+    """
+    Returns the validated --envs list stored by pytest_configure ([] without --envs).
+    """
+    return config.stash.get(ENVS_KEY, [])
+
+def pytest_configure(config):
+    """
+    Parses settings.yaml once and validates --envs up front so a typo fails fast
+    instead of erroring every test. Turns the profiler on for --layer-profile.
+    """
+    cfg = _load_config()
+    config.stash[SETTINGS_KEY] = cfg
+    config.stash[ENVS_KEY] = _parse_envs(config.getoption("--envs"), cfg)
+
+    if config.stash[ENVS_KEY] and config.getoption("--env"):
+        raise pytest.UsageError("Use either --env or --envs, not both")
+
+    if config.getoption("--layer-profile"):
+        PROFILER.enable(logger=get_logger("AE.API"))
+
+def pytest_unconfigure(config):
+    """
+    Writes the folded profile stacks and switches the profiler off again.
+    """
+    if PROFILER.enabled:
+        PROFILER.write_folded(config.getoption("--layer-profile-output"))
+        PROFILER.disable()
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """
+    With --layer-profile, times the test body by layer and attaches the breakdown to Allure.
+    """
+    if not PROFILER.enabled:
+        yield
+        return
+
+    PROFILER.start_test(item.nodeid)
+    yield
+    breakdown = PROFILER.stop_test()
+    allure.attach(
+        format_breakdown(breakdown),
+        name="profile-breakdown",
+        attachment_type=allure.attachment_type.TEXT
     )
 
+def pytest_generate_tests(metafunc):
+    """
+    With --envs, runs every API test once per environment (target_env becomes a session parameter).
+    Tests that never talk to the API (no client/fanout fixture, or marked unit) run once.
+    """
+    envs = _selected_envs(metafunc.config)
+    uses_api = "client" in metafunc.fixturenames or "fanout" in metafunc.fixturenames
+    if envs and uses_api and not metafunc.definition.get_closest_marker("unit"):
+        metafunc.parametrize("target_env", envs, indirect=True, scope="session")
+
 @pytest.fixture(scope="session")
-def target_env(pytestconfig):
+def target_env(request, pytestconfig):
+    """
+    Reads the --env value from CLI and returns it (default = dev).
+    With --envs, returns the environment this test instance runs against
+    (or all selected environments for tests that aren't run per environment).
+    """
+    if hasattr(request, "param"):
+        return request.param
+
+    envs = _selected_envs(pytestconfig)
+    if envs:
+        return ",".join(envs)
+    return (pytestconfig.getoption("--env") or "dev").lower()
+
+def _fanout_test_key(item):
     """
-    Reads the --env value from CLI and returns it (default = dev)
+    Identifies a test independently of its environment: nodeid without the parameter part,
+    plus the indices of every parameter except target_env.
     """
-    return pytestconfig.getoption("--env").lower()
+    callspec = getattr(item, "callspec", None)
+    indices = {} if callspec is None else {
+        name: index for name, index in callspec.indices.items() if name != "target_env"
+    }
+    return item.nodeid.split("[", 1)[0], tuple(sorted(indices.items()))
 
 @pytest.fixture(scope="session")
 def logger():
@@ -46,12 +179,40 @@ def logger():
     return get_logger("AE.API")
 
 @pytest.fixture(scope="session")
-def client(target_env, logger):
+def fanout(pytestconfig, logger):
+    """
+    Builds one warmed-up APIClient per --envs environment, shared by all tests.
+    Writes the environment comparison report when the session ends.
+    """
+    cfg = pytestconfig.stash[SETTINGS_KEY]
+    clients = {}
+    for env in _selected_envs(pytestconfig):
+        base_url = cfg["envs"][env]["base_url"]
+        logger.info(f"[ENV={env}] Using base URL: {base_url}")
+        clients[env] = APIClient(base_url=base_url)
+        clients[env].warm_up()
+
+    runner = EnvFanOut(clients)
+    yield runner
+
+    report_path = runner.write_report(pytestconfig.getoption("--envs-report"))
+    logger.info(f"[ENVS={','.join(clients)}] Comparison report written to {report_path}")
+    for env, env_client in clients.items():
+        logger.info(f"[ENV={env}] Connection pool stats: {env_client.pool_stats()}")
+    runner.close()
+
+@pytest.fixture(scope="session")
+def client(request, target_env, logger):
     """
     Builds an APIClient using base_url from settings.yaml based on selected environment.
+    Pre-opens pooled connections so cold-start latency doesn't land on the first test.
+    With --envs, returns a client bound to target_env that shares requests with the other envs.
     """
-    with open("config/settings.yaml", "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
+    if _selected_envs(request.config):
+        yield request.getfixturevalue("fanout").view(target_env)
+        return
+
+    cfg = request.config.stash[SETTINGS_KEY]
 
     env_config = cfg.get("envs", {}).get(target_env)
     if not env_config:
@@ -60,7 +221,14 @@ def client(target_env, logger):
     base_url = env_config["base_url"]
     logger.info(f"[ENV={target_env}] Using base URL: {base_url}")
 
-    return APIClient(base_url=base_url)
+    api_client = APIClient(base_url=base_url)
+    opened = api_client.warm_up()
+    logger.info(f"[ENV={target_env}] Warmed up {opened} pooled connection(s)")
+
+    yield api_client
+
+    logger.info(f"[ENV={target_env}] Connection pool stats: {api_client.pool_stats()}")
+    api_client.session.close()
 
 # @pytest.fixture
 # def attach_response():
@@ -88,6 +256,16 @@ def client(target_env, logger):
 #             print(f"⚠️ Failed to attach response to Allure: {e}")
 #     return _attach
 
+@pytest.fixture(autouse=True)
+def fanout_test_scope(request):
+    """
+    With --envs, tells the fan-out which test is about to call the API,
+    so its calls line up with the same test in the other environments.
+    """
+    if _selected_envs(request.config) and "client" in request.fixturenames:
+        runner = request.getfixturevalue("fanout")
+        runner.begin_test(request.getfixturevalue("target_env"), _fanout_test_key(request.node))
+
 @pytest.fixture(autouse=True)
 def label_env_in_allure(target_env):
     """
@@ -0,0 +1,173 @@
+"""
+Offline checks for APIClient connection pooling (no real API needed).
+
+Checks:
+- warm_up() pre-opens connections and resets the pool counters
+- Requests after warm-up reuse the warmed connections
+- warm_up() against a closed port returns 0 instead of raising
+- DNS cache keeps every address, falls back between them and is re-checked on reconnect
+- Overflow connections in non-blocking mode are counted as discarded
+- urllib3/requests internals used by warm_up() and the tracked pools still exist
+"""
+
+import http.server
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+import src.api_client as api_client
+from src.api_client import APIClient, PooledAdapter
+
+pytestmark = pytest.mark.unit
+
+
+class _KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+
+    def do_GET(self):
+        if "slow" in self.path:
+            time.sleep(0.3)  # keeps the connection busy so parallel requests overflow the pool
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def local_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_port
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def clean_dns_cache():
+    api_client._DNS_CACHE.clear()
+    yield
+    api_client._DNS_CACHE.clear()
+
+
+def test_warm_up_opens_connections_and_resets_stats(local_server):
+    client = APIClient(base_url=f"http://127.0.0.1:{local_server}/api", timeout=2)
+
+    assert client.warm_up(2) == 2
+    stats = client.pool_stats()
+    assert stats["prewarmed"] == 2
+    assert stats["checkouts"] == 0
+
+
+def test_requests_after_warm_up_reuse_connections(local_server):
+    client = APIClient(base_url=f"http://127.0.0.1:{local_server}/api", timeout=2)
+    client.warm_up(2)
+
+    for _ in range(3):
+        assert client.get("productsList").status_code == 200
+
+    stats = client.pool_stats()
+    assert stats["checkouts"] == 3
+    assert stats["new_connections"] == 0
+    assert stats["reuse_ratio"] == 1.0
+
+
+def test_pool_overflow_is_counted_as_discarded(local_server):
+    client = APIClient(base_url=f"http://127.0.0.1:{local_server}/api", timeout=2, pool_maxsize=1)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda _: client.get("slow"), range(3)))
+
+    stats = client.pool_stats()
+    assert stats["waits"] == 0
+    assert stats["discarded"] >= 1
+
+
+def test_blocking_pool_counts_waits(local_server):
+    client = APIClient(base_url=f"http://127.0.0.1:{local_server}/api", timeout=2, pool_maxsize=1, pool_block=True)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda _: client.get("slow"), range(3)))
+
+    stats = client.pool_stats()
+    assert stats["waits"] >= 1
+    assert stats["discarded"] == 0
+
+
+def test_warm_up_against_closed_port_returns_zero():
+    client = APIClient(base_url="http://127.0.0.1:1/api", timeout=1)
+
+    assert client.warm_up(2) == 0
+    assert client.pool_stats()["prewarmed"] == 0
+
+
+def test_dns_cache_keeps_all_addresses_and_falls_back(local_server):
+    # 127.0.0.2 refuses (server only listens on 127.0.0.1), so the second address must be tried
+    api_client._DNS_CACHE[("localhost", local_server)] = (["127.0.0.2", "127.0.0.1"], time.monotonic() + 60)
+    client = APIClient(base_url=f"http://localhost:{local_server}/api", timeout=2, dns_cache_ttl=60)
+
+    assert client.get("productsList").status_code == 200
+
+
+def test_dns_cache_forgets_addresses_when_all_fail(local_server):
+    api_client._DNS_CACHE[("localhost", local_server)] = (["127.0.0.2"], time.monotonic() + 60)
+    client = APIClient(base_url=f"http://localhost:{local_server}/api", timeout=2, dns_cache_ttl=60)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.session.get(client._url("productsList"), timeout=2)
+    assert ("localhost", local_server) not in api_client._DNS_CACHE
+
+
+def test_dns_cache_is_rechecked_on_every_reconnect(local_server, monkeypatch):
+    lookups = []
+    real_resolve = api_client._resolve_host
+    monkeypatch.setattr(
+        api_client, "_resolve_host",
+        lambda host, port, ttl: lookups.append(host) or real_resolve(host, port, ttl),
+    )
+    client = APIClient(base_url=f"http://localhost:{local_server}/api", timeout=2, dns_cache_ttl=60)
+
+    client.get("productsList")
+    # Drop the open sockets; the pool keeps the same HTTPConnection objects and reconnects them
+    for pool in client.adapter.poolmanager.pools._container.values():
+        for conn in list(pool.pool.queue):
+            if conn is not None:
+                conn.close()
+    client.get("productsList")
+
+    assert lookups == ["localhost", "localhost"]
+
+
+def test_resolve_host_caches_full_address_list():
+    addresses = api_client._resolve_host("localhost", 80, ttl=60)
+
+    assert "127.0.0.1" in addresses
+    assert api_client._DNS_CACHE[("localhost", 80)][0] == addresses
+
+
+def test_urllib3_internals_used_by_warm_up_exist():
+    """
+    warm_up() and the tracked pools rely on private urllib3/requests APIs.
+    If an upgrade removes them this test fails instead of warm-up silently doing nothing.
+    """
+    for name in ("_get_conn", "_put_conn", "_new_conn"):
+        assert callable(getattr(HTTPConnectionPool, name, None)), f"HTTPConnectionPool.{name} is gone"
+    assert callable(getattr(PoolManager, "_new_pool", None)), "PoolManager._new_pool is gone"
+    assert callable(getattr(HTTPAdapter, "get_connection_with_tls_context", None))
+
+    adapter = PooledAdapter(pool_maxsize=7)
+    assert adapter._pool_maxsize == 7
+    assert isinstance(adapter.poolmanager, api_client._TrackedPoolManager)
+
+    assert HTTPConnection("example.com")._dns_host == "example.com"
@@ -0,0 +1,213 @@
+"""
+Offline checks for the --envs fan-out runner (src/fanout.py) using fake clients.
+
+Checks:
+- Calls are matched across environments by (test, call index) and sent once per env
+- Dynamic payloads still match; unmatched calls only go to the calling environment
+- File/iterator bodies are read once and every environment sends the full body
+- Finished slots are removed from the pending table
+- A worker exception is only re-raised for the environment that hit it
+- Report shows status mismatches and the slowest environment
+- Payload diffs are de-duplicated and truncated at DIFF_PREVIEW_LINES
+"""
+
+import io
+import json
+import threading
+import uuid
+from datetime import timedelta
+
+import pytest
+import requests
+
+from src import fanout as fanout_module
+from src.fanout import EnvFanOut
+
+pytestmark = pytest.mark.unit
+
+
+def _response(status=200, body=None, elapsed=0.1):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = json.dumps(body if body is not None else {"ok": True}).encode()
+    resp.encoding = "utf-8"
+    resp.elapsed = timedelta(seconds=elapsed)
+    return resp
+
+
+class FakeClient:
+    """
+    Stands in for APIClient: returns canned responses (or raises) and counts calls.
+    """
+
+    def __init__(self, base_url="http://fake/api", status=200, body=None, elapsed=0.1, error=None):
+        self.base_url = base_url
+        self.status = status
+        self.body = body
+        self.elapsed = elapsed
+        self.error = error
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def request(self, method, path, **kwargs):
+        with self._lock:
+            self.calls.append((method, path, kwargs))
+            number = len(self.calls)
+        if self.error:
+            raise self.error
+        body = self.body if self.body is not None else {"call": number}
+        return _response(self.status, body, self.elapsed)
+
+
+@pytest.fixture
+def make_fanout():
+    runners = []
+
+    def _make(**clients):
+        runner = EnvFanOut(clients)
+        runners.append(runner)
+        return runner
+
+    yield _make
+    for runner in runners:
+        runner._executor.shutdown(wait=True)
+
+
+def _call(runner, env, method, path, test="tests/test_x.py::test_x", **kwargs):
+    """
+    Runs one single-call test for env (as the conftest fixtures would) and returns the response.
+    """
+    runner.begin_test(env, (test, ()))
+    return runner.view(env).request(method, path, **kwargs)
+
+
+def test_calls_matched_by_test_and_index_and_sent_once_per_env(make_fanout):
+    dev, qa = FakeClient(), FakeClient()
+    runner = make_fanout(dev=dev, qa=qa)
+
+    runner.begin_test("dev", ("t", ()))
+    dev_first = runner.view("dev").get("productsList")
+    dev_second = runner.view("dev").get("productsList")
+    assert len(runner._pending) == 2  # qa hasn't collected either response yet
+
+    runner.begin_test("qa", ("t", ()))
+    qa_first = runner.view("qa").get("productsList")
+    qa_second = runner.view("qa").get("productsList")
+
+    assert len(dev.calls) == 2 and len(qa.calls) == 2
+    assert [r.json()["call"] for r in (dev_first, dev_second)] == [1, 2]
+    assert sorted(r.json()["call"] for r in (qa_first, qa_second)) == [1, 2]
+    assert runner._pending == {}
+
+
+def test_dynamic_payloads_still_match(make_fanout):
+    dev, qa = FakeClient(), FakeClient()
+    runner = make_fanout(dev=dev, qa=qa)
+
+    _call(runner, "dev", "POST", "createAccount", data={"email": f"{uuid.uuid4()}@x.io"})
+    _call(runner, "qa", "POST", "createAccount", data={"email": f"{uuid.uuid4()}@x.io"})
+
+    assert len(dev.calls) == 1 and len(qa.calls) == 1
+    assert runner._pending == {}
+
+
+def test_unmatched_calls_only_go_to_calling_env(make_fanout):
+    dev, qa = FakeClient(), FakeClient()
+    runner = make_fanout(dev=dev, qa=qa)
+
+    # No test announced
+    runner.view("qa").delete("deleteAccount")
+    assert len(dev.calls) == 0 and len(qa.calls) == 1
+
+    # Same test and index but a different endpoint
+    _call(runner, "dev", "GET", "productsList")
+    _call(runner, "qa", "DELETE", "deleteAccount")
+    runner._collect()  # wait for the fanned-out calls
+    assert [c[:2] for c in dev.calls] == [("GET", "productsList")]
+    assert sorted(c[:2] for c in qa.calls) == [
+        ("DELETE", "deleteAccount"), ("DELETE", "deleteAccount"), ("GET", "productsList"),
+    ]
+
+    # Re-running a test whose calls were already collected by every environment
+    _call(runner, "dev", "GET", "brandsList", test="t2")
+    _call(runner, "qa", "GET", "brandsList", test="t2")
+    _call(runner, "dev", "GET", "brandsList", test="t2")
+    runner._collect()
+    assert len(dev.calls) == 3 and len(qa.calls) == 4
+
+
+def test_file_and_iterator_bodies_reach_every_env(make_fanout):
+    dev, qa = FakeClient(), FakeClient()
+    runner = make_fanout(dev=dev, qa=qa)
+
+    upload = io.BytesIO(b"payload")
+    upload.name = "payload.txt"
+    _call(runner, "dev", "POST", "upload", files={"f": upload}, data=iter([b"a", "b"]))
+    runner._collect()  # wait for qa's copy of the call
+
+    for fake in (dev, qa):
+        kwargs = fake.calls[0][2]
+        assert kwargs["files"]["f"] == ("payload.txt", b"payload")
+        assert kwargs["data"] == b"ab"
+    assert dev.calls[0][2] is not qa.calls[0][2]
+
+
+def test_worker_exception_only_raised_for_failing_env(make_fanout):
+    dev = FakeClient()
+    qa = FakeClient(error=requests.exceptions.ConnectionError("qa is down"))
+    runner = make_fanout(dev=dev, qa=qa)
+
+    assert _call(runner, "dev", "GET", "brandsList").status_code == 200
+    with pytest.raises(requests.exceptions.ConnectionError, match="qa is down"):
+        _call(runner, "qa", "GET", "brandsList")
+
+    assert "| GET /brandsList | 1 | 200 · 0.100s | ConnectionError |" in runner.report()
+
+
+def test_report_flags_status_mismatch_and_slowest_env(make_fanout):
+    runner = make_fanout(
+        dev=FakeClient(status=200, body={"a": 1}, elapsed=0.1),
+        qa=FakeClient(status=500, body={"a": 1}, elapsed=0.3),
+    )
+    _call(runner, "dev", "GET", "productsList")
+
+    row = next(line for line in runner.report().splitlines() if line.startswith("| GET /productsList"))
+    assert "| 200 · 0.100s | 500 · 0.300s |" in row
+    assert "⚠️ yes" in row
+    assert row.endswith("| qa (3.0x) |")
+
+
+def test_report_slowest_column_without_measurable_latency(make_fanout):
+    runner = make_fanout(
+        dev=FakeClient(body={"a": 1}, elapsed=0),
+        qa=FakeClient(body={"a": 1}, elapsed=0.2),
+    )
+    _call(runner, "dev", "GET", "productsList")
+
+    row = next(line for line in runner.report().splitlines() if line.startswith("| GET /productsList"))
+    assert row.endswith("| no | - |")
+    assert "inf" not in row
+
+
+def test_report_deduplicates_and_truncates_payload_diffs(make_fanout):
+    runner = make_fanout(
+        dev=FakeClient(body={"products": list(range(100))}),
+        qa=FakeClient(body={"products": list(range(100, 200))}),
+    )
+    runner.begin_test("dev", ("t", ()))
+    runner.view("dev").get("productsList")
+    runner.view("dev").get("productsList")
+
+    report = runner.report()
+    assert report.count("### GET /productsList: dev → qa") == 1
+
+    diff_block = report.split("```diff\n", 1)[1].split("\n```", 1)[0].splitlines()
+    assert len(diff_block) == fanout_module.DIFF_PREVIEW_LINES + 1
+    assert diff_block[-1].startswith("... (") and diff_block[-1].endswith("more lines)")
+
+
+def test_report_without_differences(make_fanout):
+    runner = make_fanout(dev=FakeClient(body={"a": 1}), qa=FakeClient(body={"a": 1}))
+    _call(runner, "qa", "GET", "brandsList")
+
+    assert "No payload differences found." in runner.report()
@@ -0,0 +1,217 @@
+"""
+Offline checks for the --layer-profile layer profiler (src/utils/profiler.py).
+
+Checks:
+- Layer self-time excludes nested layers; unattributed time goes to "test"
+- Re-entering the same layer is merged into one frame
+- stop_test() unwinds layers left open (e.g. by an exception)
+- ';' in test ids is escaped in folded stack names
+- Calls from other threads are ignored
+- enable()/disable() keep allure.attach (and .file) intact and restore everything patched
+- Allure file writes are timed as allure_io, separate from attach_response formatting
+- write_folded() creates the output folder
+- format_breakdown() lists layers slowest first
+"""
+
+import logging
+import threading
+
+import allure
+import allure_commons
+import pytest
+import requests
+
+from src.utils import profiler as profiler_module
+from src.utils.attachments import attach_response
+from src.utils.profiler import PROFILER, LayerProfiler, format_breakdown
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(profiler_module.time, "perf_counter", fake)
+    return fake
+
+
+@pytest.fixture
+def profiler():
+    p = LayerProfiler()
+    p.enabled = True  # trace without patching requests/allure/logging
+    return p
+
+
+def test_self_time_excludes_children(profiler, clock):
+    profiler.start_test("t")
+    clock.now = 1
+    with profiler.layer("transport"):
+        clock.now = 2
+        with profiler.layer("decode"):
+            clock.now = 5
+        clock.now = 10
+    clock.now = 12
+    breakdown = profiler.stop_test()
+
+    assert breakdown["total"] == 12
+    assert breakdown["layers"] == {"decode": 3, "transport": 6, "test": 3}
+    assert profiler.folded().splitlines() == [
+        "t;transport;decode 3000000",
+        "t;transport 6000000",
+        "t 3000000",
+    ]
+
+
+def test_reentered_layer_is_merged(profiler, clock):
+    profiler.start_test("t")
+    clock.now = 1
+    with profiler.layer("attachments"):
+        clock.now = 2
+        with profiler.layer("attachments"):
+            clock.now = 3
+        clock.now = 4
+    breakdown = profiler.stop_test()
+
+    assert breakdown["layers"]["attachments"] == 3
+    assert "t;attachments;attachments" not in profiler.folded()
+
+
+def test_stop_test_unwinds_open_layers(profiler, clock):
+    profiler.start_test("t")
+    clock.now = 1
+    profiler.layer("transport").__enter__()
+    clock.now = 2
+    profiler.layer("decode").__enter__()
+    clock.now = 5
+    breakdown = profiler.stop_test()
+
+    assert breakdown["total"] == 5
+    assert breakdown["layers"] == {"decode": 3, "transport": 1, "test": 1}
+    assert profiler.layer("transport") is profiler_module._NO_LAYER  # no test running anymore
+
+
+def test_semicolon_in_test_id_is_escaped(profiler, clock):
+    profiler.start_test("tests/test_x.py::test_y[a;b]")
+    clock.now = 1
+    with profiler.layer("transport"):
+        clock.now = 2
+    breakdown = profiler.stop_test()
+
+    assert breakdown["test"] == "tests/test_x.py::test_y[a,b]"
+    assert "tests/test_x.py::test_y[a,b];transport 1000000" in profiler.folded().splitlines()
+
+
+def test_other_threads_are_not_traced(profiler, clock):
+    profiler.start_test("t")
+    scopes = []
+    worker = threading.Thread(target=lambda: scopes.append(profiler.layer("transport")))
+    worker.start()
+    worker.join()
+    profiler.stop_test()
+
+    assert scopes == [profiler_module._NO_LAYER]
+
+
+def test_layers_are_noop_when_disabled():
+    p = LayerProfiler()
+    p.start_test("t")
+
+    assert p.layer("transport") is profiler_module._NO_LAYER
+    assert p.stop_test() == {}
+
+
+def test_enable_keeps_allure_attach_and_times_attachments(tmp_path):
+    original_attach = allure.attach
+    attachment = tmp_path / "payload.txt"
+    attachment.write_text("payload", encoding="utf-8")
+
+    p = LayerProfiler()
+    p.enable()
+    try:
+        assert allure.attach is original_attach
+        assert hasattr(allure.attach, "file")
+
+        p.start_test("t")
+        allure.attach("body", name="profiler-data", attachment_type=allure.attachment_type.TEXT)
+        allure.attach.file(str(attachment), name="profiler-file", attachment_type=allure.attachment_type.TEXT)
+        breakdown = p.stop_test()
+    finally:
+        p.disable()
+
+    assert "allure_io" in breakdown["layers"]
+
+
+def test_attach_response_formatting_and_allure_io_are_separate_frames():
+    request = requests.Request("GET", "http://fake/api/productsList").prepare()
+    response = requests.Response()
+    response.request = request
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json"
+    response._content = b'{"products": [1, 2, 3]}'
+    response.encoding = "utf-8"
+
+    # attach_response is decorated with the shared PROFILER
+    if PROFILER.enabled:
+        pytest.skip("shared PROFILER is already profiling this session (--layer-profile)")
+    PROFILER.enable()
+    try:
+        PROFILER.start_test("t")
+        attach_response(response, "productsList")
+        breakdown = PROFILER.stop_test()
+        folded = PROFILER.folded()
+    finally:
+        PROFILER.disable()
+
+    assert {"attachments", "allure_io", "decode"} <= set(breakdown["layers"])
+    stacks = {line.rsplit(" ", 1)[0] for line in folded.splitlines()}
+    assert "t;attachments;allure_io" in stacks
+    assert "t;attachments;decode" in stacks
+
+
+def test_disable_restores_everything_patched():
+    logger = logging.getLogger("AE.API.profiler-test")
+    original_json = requests.Response.json
+    original_attach = allure.attach
+
+    p = LayerProfiler()
+    p.enable(logger=logger)
+    timer = p._attach_timer
+    assert requests.Response.json is not original_json
+    assert "callHandlers" in vars(logger)
+    assert allure_commons.plugin_manager.is_registered(timer)
+
+    p.disable()
+    assert requests.Response.json is original_json
+    assert "callHandlers" not in vars(logger)
+    assert allure.attach is original_attach
+    assert not allure_commons.plugin_manager.is_registered(timer)
+    assert not p.enabled
+
+
+def test_write_folded_creates_output_folder(profiler, clock, tmp_path):
+    profiler.start_test("t")
+    clock.now = 1
+    profiler.stop_test()
+
+    path = profiler.write_folded(str(tmp_path / "artifacts" / "profile.folded"))
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "t 1000000\n"
+
+
+def test_format_breakdown_lists_slowest_layer_first():
+    table = format_breakdown({"test": "t", "total": 2.0, "layers": {"decode": 0.5, "transport": 1.5}})
+    lines = table.splitlines()
+
+    assert lines[0].split() == ["Layer", "Seconds", "Share"]
+    assert lines[1].split() == ["transport", "1.5000", "75.0%"]
+    assert lines[2].split() == ["decode", "0.5000", "25.0%"]
+    assert lines[3].split() == ["total", "2.0000"]